@@ -5,19 +5,25 @@ Interactive UI for document Q&A with multi-format support
 
 import streamlit as st
 import os
+import asyncio
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 
 # Import RAG pipeline components
 from src.dataloader import load_all_data
 from src.datasplitter import split_docs
-from src.embedding import huggingface_embeddings
-from src.vectorstore import create_vectorstore, load_vectorstore
+from src.embedding import huggingface_embeddings, remote_embeddings
+from src.vectorstore import create_vectorstore, load_vectorstore, upsert_docs
 from src.chain import create_rag_chain
+from src.utils import configure_logging, create_semantic_cache, lookup_semantic_cache, add_to_semantic_cache
 
 # Load environment variables
 load_dotenv()
 
+# ingestion / splitting progress is logged; show it on the console like the other prints
+configure_logging()
+
 # ============================================================
 # PAGE CONFIGURATION
 # ============================================================
@@ -87,28 +93,87 @@ if "total_docs" not in st.session_state:
     st.session_state.total_docs = 0
 if "total_chunks" not in st.session_state:
     st.session_state.total_chunks = 0
+if "semantic_cache" not in st.session_state:
+    st.session_state.semantic_cache = None
 
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
 
+@st.cache_resource(show_spinner=False)
+def _get_embeddings():
+    """Build the embedding model once per process and reuse it across reruns"""
+    # a shared embedding server avoids loading the model in every process
+    embed_server_url = os.getenv("EMBED_SERVER_URL")
+    if embed_server_url:
+        return remote_embeddings(embed_server_url)
+    return huggingface_embeddings()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_event_loop():
+    """One long-lived event loop (on a background thread) for every session's LLM calls:
+    the Groq async client's connection pool is bound to the loop it first ran on"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+    return loop
+
+
+@st.cache_resource(show_spinner=False)
+def _get_llm_slots():
+    """Process-wide cap on in-flight LLM requests across all user sessions
+    (they all stream on the shared event loop, so an asyncio semaphore suffices)"""
+    return asyncio.BoundedSemaphore(
+        int(os.getenv("MAX_CONCURRENT_LLM_REQUESTS", "32")))
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _get_vectorstore(vectorstore_path, index_mtime_ns, _embeddings):
+    """Load the FAISS index once per on-disk version (keyed on its mtime)"""
+    vectorstore = load_vectorstore(_embeddings, vectorstore_path=vectorstore_path)
+    # raising keeps the failure out of the cache, so the next Initialize retries the load
+    if vectorstore is None:
+        raise RuntimeError(
+            f"Could not load the vector store from '{vectorstore_path}' (see logs)")
+    return vectorstore
+
+
+def _index_mtime_ns(vectorstore_path):
+    """Modification time of the saved index, used to bust the vectorstore cache"""
+    return os.stat(os.path.join(vectorstore_path, "index.faiss")).st_mtime_ns
+
+
+def _corpus_fingerprint(data_dir):
+    """(path, size, mtime) for every file under data_dir; changes exactly when files change"""
+    fingerprint = []
+    for path in Path(data_dir).rglob("*"):
+        if path.is_file():
+            stat = path.stat()
+            fingerprint.append((str(path), stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(fingerprint))
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _load_and_split(data_dir, corpus_fingerprint, urls):
+    """Load and chunk the corpus, skipping all parsing when nothing has changed"""
+    docs = load_all_data(data_dir, list(urls))
+    return len(docs), split_docs(docs)
+
+
 def initialize_pipeline(data_dir, urls=None):
     """Initialize the RAG pipeline with documents"""
     try:
-        with st.spinner("🔄 Loading documents..."):
-            # Load documents
-            docs = load_all_data(data_dir, urls if urls else [])
+        with st.spinner("🔄 Loading and splitting documents..."):
+            # Load and split documents (cached on file sizes/mtimes + URLs)
+            total_docs, chunked_docs = _load_and_split(
+                data_dir, _corpus_fingerprint(data_dir), tuple(urls or ()))
 
-            if not docs:
+            if not total_docs:
                 st.error("❌ No documents found in the data directory!")
                 return False
 
-            st.session_state.total_docs = len(docs)
-
-        with st.spinner("✂️ Splitting documents into chunks..."):
-            # Split documents
-            chunked_docs = split_docs(docs)
+            st.session_state.total_docs = total_docs
 
             if not chunked_docs:
                 st.error("❌ Failed to create document chunks!")
@@ -118,19 +183,22 @@ def initialize_pipeline(data_dir, urls=None):
 
         with st.spinner("🧠 Generating embeddings..."):
             # Initialize embeddings
-            embeddings = huggingface_embeddings()
+            embeddings = _get_embeddings()
 
         with st.spinner("💾 Creating/Loading vector store..."):
             # Create or load vectorstore
             if os.path.exists("faiss_index"):
-                vectorstore = load_vectorstore(
-                    embeddings, vectorstore_path="faiss_index")
+                vectorstore = _get_vectorstore(
+                    "faiss_index", _index_mtime_ns("faiss_index"), embeddings)
                 st.info("ℹ️ Loaded existing vector store")
             else:
                 vectorstore = create_vectorstore(chunked_docs, embeddings)
                 st.success("✅ Created new vector store")
 
             st.session_state.vectorstore = vectorstore
+            # Answers from a previous corpus must not be served again
+            st.session_state.semantic_cache = create_semantic_cache(
+                vectorstore.index.d)
 
         with st.spinner("⚡ Building RAG chain..."):
             # Create RAG chain
@@ -145,23 +213,70 @@ def initialize_pipeline(data_dir, urls=None):
         return False
 
 
-def process_query(query):
-    """Process user query and return response"""
+async def _next_or_done(async_gen):
     try:
-        if not st.session_state.pipeline_ready:
-            return "⚠️ Please initialize the pipeline first!"
+        return False, await anext(async_gen)
+    except StopAsyncIteration:
+        return True, None
+
+
+def _iterate_async(async_gen):
+    """Drive an async generator on the shared event loop from Streamlit's script thread,
+    closing it (and running its cleanup) even when the script is interrupted mid-stream"""
+    loop = _get_event_loop()
+    try:
+        while True:
+            done, item = asyncio.run_coroutine_threadsafe(
+                _next_or_done(async_gen), loop).result()
+            if done:
+                return
+            yield item
+    finally:
+        asyncio.run_coroutine_threadsafe(async_gen.aclose(), loop).result()
+
 
-        # Get response from RAG chain
-        response = st.session_state.rag_chain.invoke({"input": query})
+def process_query(query, context):
+    """Stream the answer to a user query token by token; retrieved documents are collected into context"""
+    if not st.session_state.pipeline_ready:
+        return iter(["⚠️ Please initialize the pipeline first!"])
 
-        # Extract answer and context
-        answer = response.get("answer", "No answer available")
-        context = response.get("context", [])
+    # session state is only reachable from the script thread, so it is read here
+    # and handed to the coroutine that streams the answer on the shared event loop
+    return _iterate_async(_stream_answer(
+        query, context, st.session_state.rag_chain, st.session_state.semantic_cache,
+        _get_embeddings(), _get_llm_slots()))
 
-        return answer, context
+
+async def _stream_answer(query, context, rag_chain, semantic_cache, embeddings, llm_slots):
+    try:
+        # Reuse the answer of a near-identical earlier question if we have one
+        # (embedded off the loop so other sessions' streams aren't stalled)
+        query_embedding = await asyncio.to_thread(embeddings.embed_query, query)
+        cached = lookup_semantic_cache(semantic_cache, query_embedding)
+        if cached:
+            answer, cached_context = cached
+            context.extend(cached_context)
+            yield answer
+            return
+
+        # Stream response from RAG chain (context arrives first, then answer tokens),
+        # waiting for a free slot to respect provider rate limits
+        async with llm_slots:
+            answer = ""
+            # the embedding from the cache lookup is reused for retrieval
+            async for chunk in rag_chain.astream(
+                    {"input": query, "query_embedding": query_embedding}):
+                context.extend(chunk.get("context", []))
+                token = chunk.get("answer", "")
+                if token:
+                    answer += token
+                    yield token
+
+        add_to_semantic_cache(
+            semantic_cache, query_embedding, (answer, list(context)))
 
     except Exception as e:
-        return f"❌ Error processing query: {str(e)}", []
+        yield f"❌ Error processing query: {str(e)}"
 
 
 # ============================================================
@@ -207,7 +322,30 @@ with st.sidebar:
         st.session_state.chat_history = []
         st.rerun()
 
-    # Rebuild vector store button
+    # Update vector store button (embeds only chunks not indexed yet)
+    if st.button("➕ Update Vector Store"):
+        if os.path.exists("faiss_index"):
+            with st.spinner("🧠 Embedding new chunks..."):
+                _, chunked_docs = _load_and_split(
+                    data_dir, _corpus_fingerprint(data_dir), tuple(urls or ()))
+                # writable (non-mmapped) copy; the cached one is read-only
+                vectorstore = load_vectorstore(
+                    _get_embeddings(), vectorstore_path="faiss_index", mmap=False)
+
+                if vectorstore is None:
+                    st.error("❌ Could not load the vector store. See logs for details.")
+                else:
+                    try:
+                        vectorstore, added = upsert_docs(
+                            vectorstore, chunked_docs)
+                        st.success(
+                            f"✅ Added {added} new chunks. Click 'Initialize Pipeline' to use them.")
+                    except Exception as e:
+                        st.error(f"❌ Error updating vector store: {str(e)}")
+        else:
+            st.info("ℹ️ No vector store exists.")
+
+    # Rebuild vector store button (drops everything, incl. chunks of deleted/edited files)
     if st.button("🗑️ Rebuild Vector Store"):
         if os.path.exists("faiss_index"):
             import shutil
@@ -297,7 +435,8 @@ if not st.session_state.pipeline_ready:
     - You can add multiple file formats at once
     - Optionally add web URLs to scrape
     - The vector store is saved locally for faster subsequent loads
-    - Use 'Rebuild Vector Store' if you add new documents
+    - Use 'Update Vector Store' if you add new documents
+    - Use 'Rebuild Vector Store' after editing or deleting documents
     """)
 
 else:
@@ -323,9 +462,13 @@ else:
             "content": user_query
         })
 
-        # Get response
-        with st.spinner("🤔 Thinking..."):
-            answer, context = process_query(user_query)
+        # Stream the response as it is generated; once complete it is shown
+        # from the chat history below, so the live placeholder is cleared
+        context = []
+        live_answer = st.empty()
+        with live_answer.container():
+            answer = st.write_stream(process_query(user_query, context))
+        live_answer.empty()
 
         # Add assistant response to chat history
         st.session_state.chat_history.append({
@@ -16,10 +16,14 @@ from src.datasplitter import split_docs
 from src.embedding import huggingface_embeddings
 from src.vectorstore import create_vectorstore, load_vectorstore, load_and_add_new_docs
 from src.chain import create_rag_chain
+from src.utils import configure_logging
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
+# ingestion / splitting progress is logged; show it on the console like the other prints
+configure_logging()
+
 
 # ============================================================
 # MAIN PIPELINE
@@ -0,0 +1,65 @@
+'''
+one-off script: export the sentence-transformer embedding model to ONNX and
+dynamically quantize it to int8 for fast CPU inference.
+
+usage:
+    pip install "optimum[onnxruntime]"
+    python scripts/quantize_embed.py
+    python scripts/quantize_embed.py --model sentence-transformers/all-MiniLM-L6-v2 --arch avx512_vnni
+
+src/embedding.py picks the result up automatically from ./models/<model>-int8
+when no GPU is available.
+'''
+
+import argparse
+import tempfile
+
+from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+
+QUANTIZATION_CONFIGS = {
+    "avx2": AutoQuantizationConfig.avx2,
+    "avx512": AutoQuantizationConfig.avx512,
+    "avx512_vnni": AutoQuantizationConfig.avx512_vnni,
+    "arm64": AutoQuantizationConfig.arm64,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export + int8-quantize an embedding model")
+    parser.add_argument(
+        "--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--output", default=None,
+                        help="defaults to ./models/<model name>-int8")
+    parser.add_argument("--arch", default="avx2", choices=QUANTIZATION_CONFIGS,
+                        help="target CPU instruction set for the int8 kernels")
+    args = parser.parse_args()
+
+    output_dir = args.output or f"./models/{args.model.split('/')[-1]}-int8"
+
+    print(f"\n[INFO] Exporting {args.model} to ONNX...")
+
+    with tempfile.TemporaryDirectory() as onnx_dir:
+        model = ORTModelForFeatureExtraction.from_pretrained(
+            args.model, export=True)
+        model.save_pretrained(onnx_dir)
+
+        print(f"[INFO] Quantizing to int8 ({args.arch}, dynamic)...")
+
+        quantizer = ORTQuantizer.from_pretrained(onnx_dir)
+        quantization_config = QUANTIZATION_CONFIGS[args.arch](
+            is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=output_dir,
+                           quantization_config=quantization_config)
+
+    AutoTokenizer.from_pretrained(args.model).save_pretrained(output_dir)
+
+    print(f"\n✅✅ Saved int8 ONNX model to {output_dir}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
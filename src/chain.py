@@ -2,12 +2,77 @@
 Simple and modern RAG chain setup using LangChain Classic (Groq + FAISS).
 """
 
+from typing import Any
+
+import numpy as np
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import RunnableLambda
 from langchain_groq import ChatGroq
 from src.prompt import general_purpose_prompt, medical_information_prompt
 from langchain_classic.chains import create_retrieval_chain
 from langchain_classic.chains.combine_documents import create_stuff_documents_chain
 
 
+class VectorizedMMRRetriever(BaseRetriever):
+    """
+    Retriever that lets FAISS do the k-NN search and then re-ranks the candidates
+    with maximal marginal relevance in a few batched NumPy matrix products
+    (LangChain's MMR does the same diversification one Python-level dot at a time).
+    """
+
+    vectorstore: Any
+    k: int = 5
+    fetch_k: int = 50
+    lambda_mult: float = 0.5
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        return self.get_relevant_documents_by_vector(
+            self.vectorstore.embedding_function.embed_query(query))
+
+    def get_relevant_documents_by_vector(self, query_embedding):
+        """Same search for a query that has already been embedded (skips the embedding call)"""
+        vs = self.vectorstore
+
+        q = np.array(query_embedding, dtype=np.float32)
+        q /= max(np.linalg.norm(q), 1e-12)
+
+        _, found = vs.index.search(q[None, :], self.fetch_k)
+        ids = [int(i) for i in found[0] if i != -1]
+        if not ids:
+            return []
+
+        try:
+            candidates = vs.index.reconstruct_batch(np.asarray(ids, dtype=np.int64))
+        except RuntimeError:
+            # index can't hand back its vectors (e.g. IVF on GPU): plain top-k
+            return [self._document(ids[i]) for i in range(min(self.k, len(ids)))]
+
+        # clipped so an all-zero (e.g. badly quantized) vector scores 0 instead of NaN
+        candidates /= np.maximum(
+            np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+        relevance = candidates @ q
+        similarity = candidates @ candidates.T
+
+        # greedy MMR: k vectorized steps over the whole candidate set
+        selected = [int(np.argmax(relevance))]
+        max_similarity = similarity[selected[0]].copy()
+
+        for _ in range(min(self.k, len(ids)) - 1):
+            scores = self.lambda_mult * relevance - \
+                (1 - self.lambda_mult) * max_similarity
+            scores[selected] = -np.inf
+
+            best = int(np.argmax(scores))
+            selected.append(best)
+            max_similarity = np.maximum(max_similarity, similarity[best])
+
+        return [self._document(ids[i]) for i in selected]
+
+    def _document(self, index_id):
+        vs = self.vectorstore
+        return vs.docstore.search(vs.index_to_docstore_id[index_id])
+
+
 def create_rag_chain(vectorstore):
     """
     Create and return a complete RAG chain.
@@ -19,10 +84,11 @@ def create_rag_chain(vectorstore):
 
     print("\n🚀 Initializing RAG chain...")
 
-    # 1️⃣ Create retriever
-    retriever = vectorstore.as_retriever(
-        search_type="mmr",
-        search_kwargs={"k": 5}
+    # 1️⃣ Create retriever (FAISS top-k + vectorized MMR re-rank)
+    retriever = VectorizedMMRRetriever(
+        vectorstore=vectorstore,
+        k=5,
+        fetch_k=50
     )
 
     # 2️⃣ Initialize LLM (Groq)
@@ -40,8 +106,15 @@ def create_rag_chain(vectorstore):
     # prompt = medical_information_prompt()
 
     # 4️⃣ Build RAG chain
+    # callers that already embedded the question (e.g. for the semantic cache) pass
+    # {"input": ..., "query_embedding": ...} so retrieval doesn't embed it a second time
+    def retrieve(inputs):
+        if inputs.get("query_embedding") is not None:
+            return retriever.get_relevant_documents_by_vector(inputs["query_embedding"])
+        return retriever.invoke(inputs["input"])
+
     document_chain = create_stuff_documents_chain(llm, prompt)
-    rag_chain = create_retrieval_chain(retriever, document_chain)
+    rag_chain = create_retrieval_chain(RunnableLambda(retrieve), document_chain)
 
     print("✅✅ RAG chain created successfully!\n" + "=" * 60)
 
@@ -2,78 +2,105 @@
 contains all data loading functions for pdfs, text , word, excel, web pages, json and csv files for RAG system
 '''
 
-from pathlib import Path
+import os
+import logging
+from collections import defaultdict
 import json
-from langchain_classic.document_loaders import PyMuPDFLoader, TextLoader, WebBaseLoader, CSVLoader, JSONLoader, UnstructuredWordDocumentLoader
+from functools import lru_cache
+from itertools import chain
+import httpx
+from bs4 import BeautifulSoup
+from langchain_classic.document_loaders import PyMuPDFLoader, TextLoader, CSVLoader, JSONLoader, UnstructuredWordDocumentLoader
 from langchain_community.document_loaders import UnstructuredPowerPointLoader
 from langchain_classic.docstore.document import Document
 from langchain_excel_loader import StructuredExcelLoader
+from src.utils import FileName
 
 
 # 1.DATA INGESTION FUNCTIONS
 
+log = logging.getLogger(__name__)
+
+_SEP = "=" * 50
+
+
+# SINGLE DIRECTORY WALK, BUCKETED BY FILE EXTENSION
+
+def _discover(root):
+    '''Walk the directory tree once and group file paths by lowercase suffix'''
+    buckets = defaultdict(list)
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            buckets[os.path.splitext(filename)[1].lower()].append(
+                os.path.join(dirpath, filename))
+    return buckets
+
+
 # MAIN FUCTION TO PROCESS DIFFERENT FILE TYPES
 
-def process_files(directory, pattern, loader_class, loader_kwargs=None):
-    all_documents = []
-    directory = Path(directory)
+def process_files(files, pattern, loader_class, loader_kwargs=None):
+    per_file = []
     loader_kwargs = loader_kwargs or {}
 
-    files = list(directory.glob(f'**/*{pattern}'))
-    print(
-        f"\n====== Found {len(files)} {pattern.upper()} files to process ======")
+    log.info("====== Found %d %s files to process ======",
+             len(files), pattern.upper())
 
     for file in files:
-        print(f"\n[INFO] Processing: {file.name}")
+        name = FileName(file)
+        log.info("[INFO] Processing: %s", name)
         try:
-            loader = loader_class(str(file), **loader_kwargs)
+            loader = loader_class(file, **loader_kwargs)
             docs = loader.load()
-            all_documents.extend(docs)
-            print(f"✅ Loaded <{len(docs)}> pages from {file.name}")
-            print("=" * 50)
+            per_file.append(docs)
+            log.info("✅ Loaded <%d> pages from %s\n%s", len(docs), name, _SEP)
         except Exception as e:
-            print(f"❌ Error processing {file.name}: {e}")
+            log.error("❌ Error processing %s: %s", name, e)
             continue
 
-    print(
-        f"\n[INFO] Total {pattern.upper()} docs loaded: <{len(all_documents)}>\n")
+    # one allocation for the whole result instead of growing a list file by file
+    all_documents = list(chain.from_iterable(per_file))
+
+    log.info("[INFO] Total %s docs loaded: <%d>",
+             pattern.upper(), len(all_documents))
     return all_documents
 
 
 # ====================================================================
 # SPECIFIC FILE TYPE PROCESSING FUNCTIONS
 
-# 1. read all the pdfs inside the directory
-def process_all_pdfs(directory):
-    return process_files(directory, ".pdf", PyMuPDFLoader)
+# each takes the list of file paths of its type (see _discover)
+
+# 1. read all the pdfs
+def process_all_pdfs(files):
+    return process_files(files, ".pdf", PyMuPDFLoader)
 
 
-# 2. read all the text files inside the directory
-def process_all_texts(directory):
+# 2. read all the text files
+def process_all_texts(files):
     # Add encoding and error handling for text files
     return process_files(
-        directory,
+        files,
         ".txt",
         TextLoader,
         loader_kwargs={"encoding": "utf-8", "autodetect_encoding": True}
     )
 
 
-# 3. load all excel files in a directory using langchain_excel_loader
-def process_all_excels(directory):
-    return process_files(directory, ".xlsx", StructuredExcelLoader)
+# 3. load all excel files using langchain_excel_loader
+def process_all_excels(files):
+    return process_files(files, ".xlsx", StructuredExcelLoader)
 
 
-# 4. load all word files in a directory UnstructuredWordDocumentLoader
-def process_all_word_docs(directory):
-    return process_files(directory, ".docx", UnstructuredWordDocumentLoader)
+# 4. load all word files using UnstructuredWordDocumentLoader
+def process_all_word_docs(files):
+    return process_files(files, ".docx", UnstructuredWordDocumentLoader)
 
 
-# 5. load all csv files in a directory
-def process_all_csvs(directory):
+# 5. load all csv files
+def process_all_csvs(files):
     # Add encoding for CSV files
     return process_files(
-        directory,
+        files,
         ".csv",
         CSVLoader,
         loader_kwargs={"encoding": "utf-8"}
@@ -82,73 +109,86 @@ def process_all_csvs(directory):
 
 # 7. read all the web pages from a list of urls
 
+@lru_cache(maxsize=1)
+def _http_client():
+    # one keep-alive / HTTP/2 client for every page, instead of a new connection (and TLS handshake) per url
+    return httpx.Client(http2=True, timeout=30, follow_redirects=True,
+                        limits=httpx.Limits(max_connections=50, max_keepalive_connections=50))
+
+
+def _load_webpage(url):
+    response = _http_client().get(url)
+    response.raise_for_status()
+
+    soup = BeautifulSoup(response.text, "lxml")
+
+    metadata = {"source": url}
+    if title := soup.find("title"):
+        metadata["title"] = title.get_text()
+
+    return [Document(page_content=soup.get_text(), metadata=metadata)]
+
+
 def process_all_webpages(urls):
     '''Process all web pages in a list'''
 
-    all_documents = []
+    per_page = []
 
-    print(f"\n====== Found {len(urls)} web pages to process ======")
+    log.info("====== Found %d web pages to process ======", len(urls))
 
     for url in urls:
-        print(f"\n[INFO] Processing: {url} web page")
+        log.info("[INFO] Processing: %s web page", url)
 
         try:
-            loader = WebBaseLoader(
-                url
-            )
-            documents = loader.load()
+            documents = _load_webpage(url)
 
-            # .extend() adds individual items to the list
-            all_documents.extend(documents)
+            per_page.append(documents)
 
-            print(
-                f"\n✅ Successfully Loaded <{len(documents)}> pages from {url}")
-            print("=" * 50)
+            log.info("✅ Successfully Loaded <%d> pages from %s\n%s",
+                     len(documents), url, _SEP)
 
         except Exception as e:
-            print(f"❌ Error processing {url}: {e}")
+            log.error("❌ Error processing %s: %s", url, e)
             continue
 
-    print(
-        f"\n\n[INFO] Total WEBPAGE documents loaded: <{len(all_documents)}>\n")
+    all_documents = list(chain.from_iterable(per_page))
 
-    return all_documents
+    log.info("[INFO] Total WEBPAGE documents loaded: <%d>", len(all_documents))
 
+    return all_documents
 
-# 8. load all the pptx files inside the directory
 
-def process_all_pptx(directory):
-    '''Process all pptx files in a directory using UnstructuredPowerPointLoader'''
+# 8. load all the pptx files
 
-    all_documents = []
-    pptx_dir = Path(directory)
+def process_all_pptx(pptx_files):
+    '''Process all pptx files using UnstructuredPowerPointLoader'''
 
-    # finding all pptx files recursively
-    pptx_files = list(pptx_dir.glob('**/*.pptx'))
+    per_file = []
 
-    print(f"\n====== Found {len(pptx_files)} PPTX files to process ======")
+    log.info("====== Found %d PPTX files to process ======", len(pptx_files))
 
     for file in pptx_files:
-        print(f"\n[INFO] Processing: {file.name} file")
+        name = FileName(file)
+        log.info("[INFO] Processing: %s file", name)
 
         try:
             loader = UnstructuredPowerPointLoader(
-                str(file)
+                file
             )
             documents = loader.load()
 
-            # .extend() adds individual items to the list
-            all_documents.extend(documents)
+            per_file.append(documents)
 
-            print(
-                f"\n✅ Successfully Loaded <{len(documents)}> pages from {file.name}")
-            print("=" * 50)
+            log.info("✅ Successfully Loaded <%d> pages from %s\n%s",
+                     len(documents), name, _SEP)
 
         except Exception as e:
-            print(f"❌ Error processing {file.name}: {e}")
+            log.error("❌ Error processing %s: %s", name, e)
             continue
 
-    print(f"\n\n[INFO] Total PPTX documents loaded: <{len(all_documents)}>\n")
+    all_documents = list(chain.from_iterable(per_file))
+
+    log.info("[INFO] Total PPTX documents loaded: <%d>", len(all_documents))
 
     return all_documents
 
@@ -161,17 +201,21 @@ def load_all_data(directory, urls=None):
     """
     Load all supported file types + optional web pages from a directory.
     """
-    all_docs = []
-    all_docs += process_all_pdfs(directory)
-    all_docs += process_all_texts(directory)
-    all_docs += process_all_word_docs(directory)
-    all_docs += process_all_csvs(directory)
-    all_docs += process_all_excels(directory)
-    all_docs += process_all_pptx(directory)
-    if urls:
-        all_docs += process_all_webpages(urls)
-
-    print(f"🎯 Total documents loaded from all sources: {len(all_docs)}")
+    files = _discover(directory)
+
+    per_source = [
+        process_all_pdfs(files[".pdf"]),
+        process_all_texts(files[".txt"]),
+        process_all_word_docs(files[".docx"]),
+        process_all_csvs(files[".csv"]),
+        process_all_excels(files[".xlsx"]),
+        process_all_pptx(files[".pptx"]),
+        process_all_webpages(urls) if urls else [],
+    ]
+
+    all_docs = list(chain.from_iterable(per_source))
+
+    log.info("🎯 Total documents loaded from all sources: %d", len(all_docs))
 
     return all_docs
 
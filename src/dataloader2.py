@@ -2,242 +2,708 @@
 contains all data loading functions for pdfs, text , word, excel, web pages, json and csv files for RAG system
 '''
 
-from pathlib import Path
-from langchain_classic.document_loaders import PyMuPDFLoader, TextLoader, WebBaseLoader, CSVLoader, JSONLoader, UnstructuredWordDocumentLoader
+import os
+import json
+import asyncio
+import importlib
+import logging
+import mmap
+import multiprocessing
+import statistics
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain, groupby, islice
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import docx  # python-docx
+import fitz  # PyMuPDF
+import httpx
+import orjson
+from bs4 import BeautifulSoup
+from langchain_classic.document_loaders import CSVLoader
 from langchain_community.document_loaders import UnstructuredPowerPointLoader
+from langchain_classic.docstore.document import Document
 from langchain_excel_loader import StructuredExcelLoader
+from src.utils import FileName
 
 
 # 1.DATA INGESTION FUNCTIONS
 
+log = logging.getLogger(__name__)
 
-# 1. read all the pdfs inside the directory
+_SEP = "=" * 50
 
-def process_all_pdfs(directory):
-    '''Process all pdfs in a directory using PyMuPDF'''
 
-    all_documents = []
-    pdf_dir = Path(directory)
+# ==========================================================================
+# FILE DISCOVERY
 
-    # finding all pdfs recursively
-    pdf_files = list(pdf_dir.glob('**/*.pdf'))
+def _iter_files(root, suffix=""):
+    '''Yield paths under root ending in suffix, using os.scandir's cached entry types (no per-file stat)'''
 
-    print(f"\n====== Found {len(pdf_files)} PDF files to process ======")
+    stack = [root]
 
-    for file in pdf_files:
-        print(f"\n[INFO] Processing: {file.name} file")
+    while stack:
+        directory = stack.pop()
 
+        # a missing root or unreadable subdirectory is skipped, like Path.glob / os.walk do
         try:
-            loader = PyMuPDFLoader(
-                str(file)
+            entries = os.scandir(directory)
+        except OSError as e:
+            log.warning("⚠️ Skipping directory %s: %s", directory, e)
+            continue
+
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(suffix):
+                    yield entry.path
+
+
+@lru_cache(maxsize=32)
+def _index_dir(root):
+    '''
+    Walk root once and group its files by lowercase extension ({".pdf": (paths...), ...}),
+    so the process_all_* functions share one listing. Call _index_dir.cache_clear() to rescan.
+    '''
+    index = defaultdict(list)
+
+    for path in _iter_files(root):
+        index[os.path.splitext(path)[1].lower()].append(path)
+
+    return {suffix: tuple(paths) for suffix, paths in index.items()}
+
+
+# ==========================================================================
+# PER-FILE LOADERS
+# (module level so they can be pickled into ProcessPoolExecutor workers)
+
+def _load_one_pdf(path):
+    # raw PyMuPDF: one open + plain-text extraction per page, no loader wrapper
+    with fitz.open(path) as pdf:
+        return [
+            Document(
+                page_content=page.get_text("text"),
+                metadata={"source": path, "file_path": path,
+                          "page": i, "total_pages": pdf.page_count}
             )
-            documents = loader.load()
+            for i, page in enumerate(pdf)
+        ]
 
-            # .extend() adds individual items to the list
-            all_documents.extend(documents)
 
-            print(
-                f"\n✅ Successfully Loaded <{len(documents)}> pages from {file.name}")
-            print("=" * 50)
+def _load_one_text(path):
+    # decode straight out of the mapped pages, skipping the intermediate bytes copy of f.read()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            text = ""  # mmap refuses zero-length files
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, "utf-8", "replace")
+
+    return [Document(page_content=text, metadata={"source": path})]
+
+
+def _load_one_csv(path):
+    return CSVLoader(path).load()
+
+
+def _load_one_excel(path):
+    return StructuredExcelLoader(path).load()
+
+
+def _load_one_docx(path):
+    # python-docx straight over paragraphs + tables, skipping unstructured's partitioning pipeline
+    word_doc = docx.Document(path)
+
+    paragraphs = [p.text for p in word_doc.paragraphs]
+    cells = [cell.text for table in word_doc.tables
+             for row in table.rows for cell in row.cells]
+
+    return [Document(page_content="\n".join(paragraphs + cells), metadata={"source": path})]
+
+
+def _load_one_pptx(path):
+    return UnstructuredPowerPointLoader(path).load()
+
+
+def _load_one_json(path):
+    # whole document as compact JSON text (what JSONLoader(jq_schema=".") gives, without the jq round trip)
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+
+    return [Document(page_content=orjson.dumps(data).decode(), metadata={"source": path})]
 
-        except Exception as e:
-            print(f"❌ Error processing {file.name}: {e}")
-            continue
 
-    print(f"\n\n[INFO] Total PDF documents loaded: <{len(all_documents)}>\n")
+# extension -> per-file loader, used by ingest_directory to load a mixed tree in one pass
+LOADERS = {
+    ".pdf": _load_one_pdf,
+    ".txt": _load_one_text,
+    ".json": _load_one_json,
+    ".csv": _load_one_csv,
+    ".xlsx": _load_one_excel,
+    ".docx": _load_one_docx,
+    ".pptx": _load_one_pptx,
+}
 
-    return all_documents
+
+_CPUS = os.cpu_count() or 1
+
+# (executor, workers) per file type: parsing-heavy types get processes up to the core
+# count, small/IO-bound files get threads, web pages get concurrent async requests.
+# override a type with RAG_<TYPE>_WORKERS (e.g. RAG_PDF_WORKERS=4, RAG_WEB_WORKERS=100)
+CONCURRENCY = {
+    ".pdf": ("auto", _CPUS),
+    ".docx": ("process", _CPUS),
+    ".pptx": ("process", _CPUS),
+    ".xlsx": ("process", max(2, _CPUS // 2)),
+    ".txt": ("thread", 8),
+    ".csv": ("thread", 8),
+    ".json": ("thread", 16),
+    "web": ("async", 50),
+}
+
+
+def _env_workers(name, default):
+    '''Worker count from environment variable name; default if unset, or (with a warning) if not an int >= 1'''
+
+    value = os.environ.get(name)
+    if value is None:
+        return default
+
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = 0
+
+    if workers < 1:
+        log.warning("⚠️ Ignoring %s=%r (expected a whole number >= 1), using %s",
+                    name, value, default)
+        return default
+
+    return workers
+
+
+def _concurrency(kind):
+    executor, workers = CONCURRENCY[kind]
+
+    # RAG_LOAD_WORKERS still caps every process pool unless the type has its own override
+    if executor in ("process", "auto"):
+        workers = min(workers, _env_workers("RAG_LOAD_WORKERS", workers))
+
+    return executor, _env_workers(f"RAG_{kind.lstrip('.').upper()}_WORKERS", workers)
+
+
+def _load_safe(load_one, path):
+    '''
+    Run a per-file loader, keeping the "continue on error" behaviour:
+    returns (documents, None) on success and ([], (path, error)) on failure
+    '''
+
+    name = FileName(path)
+
+    log.info("[INFO] Processing: %s", name)
+
+    try:
+        documents = load_one(path)
+    except Exception as e:
+        return [], (path, repr(e))
+
+    log.info("✅ Successfully Loaded <%d> pages from %s\n%s",
+             len(documents), name, _SEP)
+
+    return documents, None
+
+
+def _report_errors(results):
+    '''Pass (documents, error) results through, then log every failed file in one summary'''
+
+    errors = []
+
+    for documents, error in results:
+        if error:
+            errors.append(error)
+        yield documents, error
+
+    if errors:
+        log.error("❌ %d files failed to load:\n%s", len(errors),
+                  "\n".join(f"   {path}: {error}" for path, error in errors))
 
 
 # ==========================================================================
+# WORKER LOGGING
+# (worker processes put their records on a queue; one listener thread in the
+#  parent hands them to the parent's handlers, so only one thread writes to stdout)
 
-# 2. read all the text files inside the directory
+class _ParentLogHandler(logging.Handler):
+    '''Re-dispatch a record received from a worker to the same-named logger in this process'''
 
-def process_all_texts(directory):
-    '''Process all text files in a directory'''
+    def emit(self, record):
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
 
-    all_documents = []
-    text_dir = Path(directory)
 
-    # finding all text files recursively
-    text_files = list(text_dir.glob('**/*.txt'))
+def _init_worker_logging(log_queue, level):
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+
+    # don't propagate: handlers inherited from the parent (e.g. on the "src" logger) would
+    # otherwise write to the console from every worker, next to the queued copy
+    log.handlers[:] = [QueueHandler(log_queue)]
+    log.propagate = False
+    log.setLevel(level)
+
+
+# ==========================================================================
+# WORKER START-UP
+# (runs once per worker process, before its first file)
+
+# modules the loaders import lazily on their first call; pulled in up front so
+# the first file of every worker doesn't pay for them
+_WARMUP_IMPORTS = {
+    ".pptx": ("unstructured.partition.pptx",),
+    ".xlsx": ("openpyxl",),
+}
+
+# ingestion runs next to the app / embedding model, so workers yield the CPU to them
+LOAD_WORKER_NICENESS = int(os.environ.get("RAG_LOAD_NICE", "5"))
+
+
+def _init_worker(log_queue, level, suffixes):
+    _init_worker_logging(log_queue, level)
+
+    if LOAD_WORKER_NICENESS and hasattr(os, "nice"):
+        os.nice(LOAD_WORKER_NICENESS)
+
+    for suffix in suffixes:
+        for module in _WARMUP_IMPORTS.get(suffix, ()):
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass  # the loader raises (and reports) it for the file itself
+
+
+@contextmanager
+def _forward_worker_logs():
+    log_queue = multiprocessing.Queue()
+    listener = QueueListener(log_queue, _ParentLogHandler())
+    listener.start()
+
+    try:
+        yield log_queue
+    finally:
+        listener.stop()
+
+
+# below this median file size, process start-up costs more than parsing and threads win
+THREAD_POOL_MAX_MEDIAN_BYTES = 1024 * 1024
+
+# files (process pools: batches) submitted per worker ahead of the consumer; loaded
+# documents only pile up this far, however slowly the stream is read
+IN_FLIGHT_PER_WORKER = 2
+
+# upper bound on files per process-pool batch, so a batch never holds much of the corpus
+MAX_PROCESS_BATCH = 4
+
+
+def _load_workers(paths, executor="process", workers=None):
+    if workers is None:
+        if executor == "thread":
+            # PyMuPDF drops the GIL while reading and extracting, so oversubscribe like I/O work
+            workers = min(32, _CPUS * 2)
+        else:
+            # RAG_LOAD_WORKERS overrides the pool size (e.g. to leave cores free for the app)
+            workers = _env_workers("RAG_LOAD_WORKERS", _CPUS)
+
+    return max(1, min(workers, len(paths)))
+
+
+def _pick_executor(paths):
+    '''"thread" for corpora of mostly small files, "process" otherwise'''
+
+    median_size = statistics.median(os.path.getsize(path) for path in paths)
+
+    return "process" if median_size > THREAD_POOL_MAX_MEDIAN_BYTES else "thread"
+
+
+def _load_in_parallel(load_one, paths, executor="process", workers=None):
+    '''Map a per-file loader over paths on a process (or thread) pool and flatten the results'''
+
+    return _load_all_in_parallel([load_one] * len(paths), paths, executor, workers)
+
+
+def _load_all_in_parallel(loaders, paths, executor="process", workers=None):
+    '''Run loaders[i] on paths[i] across one pool, yielding documents file by file'''
+
+    return chain.from_iterable(
+        documents for documents, _ in _load_per_file(loaders, paths, executor, workers))
+
+
+def _load_per_file(loaders, paths, executor="process", workers=None):
+    '''Run loaders[i] on paths[i] across one pool, yielding each file's (documents, error) in path order'''
+
+    # the summary is logged once the pool (and its log listener) has shut down,
+    # so it comes after every worker's own messages
+    return _report_errors(_map_in_pool(loaders, paths, executor, workers))
+
+
+def _suffix(path):
+    return os.path.splitext(path)[1].lower()
+
+
+def _load_by_type(paths):
+    '''
+    Load paths (grouped by file type, as ingest_directory lists them) with each type on
+    its own CONCURRENCY-tuned pool, yielding (documents, error) per file in path order
+    '''
+
+    # one error summary for the whole run, logged after the last type's pool has shut down
+    return _report_errors(_map_by_type(paths))
+
+
+def _map_by_type(paths):
+    for suffix, group in groupby(paths, key=_suffix):
+        group = list(group)
+        yield from _map_in_pool([LOADERS[suffix]] * len(group), group, *_concurrency(suffix))
+
+
+def _map_in_pool(loaders, paths, executor, workers=None):
+    if not paths:
+        return
+
+    if executor == "auto":
+        executor = _pick_executor(paths)
+
+        # a process-sized worker count is too small for GIL-releasing threads
+        if executor == "thread" and workers is not None:
+            workers = min(32, workers * 2)
+
+    workers = _load_workers(paths, executor, workers)
+
+    window = workers * IN_FLIGHT_PER_WORKER
+
+    if executor == "thread":
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            yield from _with_prefetch(
+                paths, _bounded_map(pool, _load_safe, zip(loaders, paths), window))
+        return
+
+    suffixes = {os.path.splitext(path)[1].lower() for path in paths}
+
+    # ~4 batches per worker amortizes IPC and balances load; capped to keep batches small
+    batch_size = max(1, min(MAX_PROCESS_BATCH, len(paths) // (workers * 4)))
+    batches = ((loaders[i:i + batch_size], paths[i:i + batch_size])
+               for i in range(0, len(paths), batch_size))
+
+    with _forward_worker_logs() as log_queue, ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(log_queue, log.getEffectiveLevel(), suffixes)) as pool:
+        # each file's pages are handed on as soon as they arrive instead of being collected first
+        yield from _with_prefetch(paths, chain.from_iterable(
+            _bounded_map(pool, _load_batch, batches, window)))
+
+
+def _load_batch(loaders, paths):
+    return [_load_safe(load_one, path) for load_one, path in zip(loaders, paths)]
 
-    print(f"\n====== Found {len(text_files)} text files to process ======")
 
-    for file in text_files:
-        print(f"\n[INFO] Processing: {file.name} file")
+def _bounded_map(pool, fn, args, window):
+    '''
+    Like pool.map(fn, *zip(*args)), but with at most `window` calls submitted ahead of
+    the consumer: the next one is submitted as each result is yielded, in order
+    '''
 
+    args = iter(args)
+    pending = deque(pool.submit(fn, *call) for call in islice(args, window))
+
+    try:
+        while pending:
+            result = pending.popleft().result()
+
+            for call in islice(args, 1):
+                pending.append(pool.submit(fn, *call))
+
+            yield result
+    finally:
+        # consumer stopped early: don't start files nobody will read
+        for future in pending:
+            future.cancel()
+
+
+# ==========================================================================
+# PAGE CACHE PREFETCH
+# (ask the kernel to start reading the next files while the current ones are parsed)
+
+PREFETCH_WINDOW = 64  # files
+
+
+def _prefetch(paths):
+    for path in paths:
         try:
-            loader = TextLoader(
-                str(file)
-            )
-            documents = loader.load()
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue  # the loader will report it
 
-            # .extend() adds individual items to the list
-            all_documents.extend(documents)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
 
-            print(
-                f"\n✅ Successfully Loaded <{len(documents)}> pages from {file.name}")
-            print("=" * 50)
 
-        except Exception as e:
-            print(f"❌ Error processing {file.name}: {e}")
-            continue
+def _start_prefetch(paths):
+    # posix_fadvise is Linux/Unix only; elsewhere files are just read cold
+    if paths and hasattr(os, "posix_fadvise"):
+        threading.Thread(target=_prefetch, args=(paths,), daemon=True).start()
+
+
+def _with_prefetch(paths, results):
+    '''Pass per-file results through, keeping the prefetch one to two windows ahead of them'''
 
-    print(f"\n\n[INFO] Total TEXT documents loaded: <{len(all_documents)}>\n")
+    _start_prefetch(paths[:PREFETCH_WINDOW])
 
-    return all_documents
+    for i, result in enumerate(results):
+        if i % PREFETCH_WINDOW == 0:
+            _start_prefetch(paths[i + PREFETCH_WINDOW:i + 2 * PREFETCH_WINDOW])
+
+        yield result
 
 
 # ==========================================================================
+# INCREMENTAL INGESTION
+# (path -> [size, mtime_ns] of every file already loaded; a file whose size and
+#  mtime haven't changed since is skipped on the next run)
 
-# 3. read all the web pages from a list of urls
+INGEST_CACHE_PATH = ".rag_ingest_cache.json"
+INGEST_CACHE_FLUSH_EVERY = 100  # files
 
-def process_all_webpages(urls):
-    '''Process all web pages in a list'''
 
-    all_documents = []
+def _load_ingest_cache(cache_path):
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    print(f"\n====== Found {len(urls)} web pages to process ======")
 
-    for url in urls:
-        print(f"\n[INFO] Processing: {url} web page")
+def _save_ingest_cache(cache, cache_path):
+    # write-then-rename so an interrupted run never leaves a truncated cache behind
+    tmp_path = f"{cache_path}.tmp"
 
-        try:
-            loader = WebBaseLoader(
-                url
-            )
-            documents = loader.load()
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
 
-            # .extend() adds individual items to the list
-            all_documents.extend(documents)
+    os.replace(tmp_path, cache_path)
 
-            print(
-                f"\n✅ Successfully Loaded <{len(documents)}> pages from {url}")
-            print("=" * 50)
 
-        except Exception as e:
-            print(f"❌ Error processing {url}: {e}")
-            continue
+def _file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_changed_files(paths, cache_path):
+    '''Load only files that changed since the last run, recording each successful load in the cache'''
+
+    cache = _load_ingest_cache(cache_path)
+    signatures = {path: _file_signature(path) for path in paths}
+
+    changed_paths = [path for path in paths
+                     if cache.get(path) != signatures[path]]
+
+    log.info("[INFO] Skipping %d unchanged files",
+             len(paths) - len(changed_paths))
+
+    results = _load_by_type(changed_paths)
 
-    print(
-        f"\n\n[INFO] Total WEBPAGE documents loaded: <{len(all_documents)}>\n")
+    try:
+        # results come back in changed_paths order; iterate them (not a zip) so the
+        # generator runs to completion and logs its error summary
+        for n, (documents, error) in enumerate(results, start=1):
+            path = changed_paths[n - 1]
 
-    return all_documents
+            yield from documents
+
+            # only reached once the consumer has asked for the document after this file's
+            # last one, i.e. it took them all; failed files stay out so the next run retries them
+            if error is None:
+                cache[path] = signatures[path]
+
+            if n % INGEST_CACHE_FLUSH_EVERY == 0:
+                _save_ingest_cache(cache, cache_path)
+    finally:
+        _save_ingest_cache(cache, cache_path)
+
+
+def _with_total(documents, label):
+    '''Pass documents through, logging how many there were once the stream is exhausted'''
+
+    count = 0
+
+    for document in documents:
+        count += 1
+        yield document
+
+    log.info("[INFO] Total %s documents loaded: <%d>", label, count)
 
 
 # ==========================================================================
+# WEB PAGE FETCHING
+# (all GETs go out concurrently on one httpx client - keep-alive, HTTP/2 multiplexing
+#  for same-host URLs - with at most CONCURRENCY["web"] in flight so we don't hammer a single host)
 
-# 5. load all csv files in a directory
+FETCH_TIMEOUT = 30  # seconds per page
 
-def process_all_csvs(directory):
-    '''Process all csv files in a directory'''
 
-    all_documents = []
-    csv_dir = Path(directory)
+def _parse_webpage(url, html):
+    '''Extract the page text the same way WebBaseLoader does'''
 
-    # finding all csv files recursively
-    csv_files = list(csv_dir.glob('**/*.csv'))
+    soup = BeautifulSoup(html, "lxml")
 
-    print(f"\n====== Found {len(csv_files)} CSV files to process ======")
+    metadata = {"source": url}
+    if title := soup.find("title"):
+        metadata["title"] = title.get_text()
 
-    for file in csv_files:
-        print(f"\n[INFO] Processing: {file.name} file")
+    return [Document(page_content=soup.get_text(), metadata=metadata)]
 
-        try:
-            loader = CSVLoader(str(file))
-            documents = loader.load()
 
-            # .extend() adds individual items to the list
-            all_documents.extend(documents)
+async def _fetch_webpage(client, semaphore, url):
+    try:
+        async with semaphore:
+            log.info("[INFO] Processing: %s web page", url)
 
-            print(
-                f"\n✅ Successfully Loaded <{len(documents)}> pages from {file.name}")
-            print("=" * 50)
+            response = await client.get(url)
+            response.raise_for_status()
+            html = response.text
 
-        except Exception as e:
-            print(f"❌ Error processing {file.name}: {e}")
-            continue
+        # parse off the event loop so other downloads keep flowing
+        loop = asyncio.get_running_loop()
+        documents = await loop.run_in_executor(None, _parse_webpage, url, html)
 
-    print(f"\n\n[INFO] Total CSV documents loaded: <{len(all_documents)}>\n")
+        log.info("✅ Successfully Loaded <%d> pages from %s\n%s",
+                 len(documents), url, _SEP)
 
-    return all_documents
+        return documents
+
+    except Exception as e:
+        log.error("❌ Error processing %s: %s", url, e)
+        return []
+
+
+async def _fetch_all_webpages(urls):
+    max_in_flight = _concurrency("web")[1]
+    semaphore = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight,
+                          max_keepalive_connections=max_in_flight)
+
+    async with httpx.AsyncClient(http2=True, timeout=FETCH_TIMEOUT, limits=limits,
+                                 follow_redirects=True) as client:
+        results = await asyncio.gather(
+            *[_fetch_webpage(client, semaphore, url) for url in urls],
+            return_exceptions=True)
+
+    # _fetch_webpage already reports its own errors; anything left (e.g. cancellation) is dropped
+    return [docs for docs in results if not isinstance(docs, BaseException)]
 
 
 # ==========================================================================
 
-# 6. load all excel files in a directory using langchain_excel_loader
+# 1. read all the pdfs inside the directory
 
-def process_all_excels(directory):
-    '''Process all excel files in a directory'''
+def process_all_pdfs(directory, executor=None):
+    '''
+    Process all pdfs in a directory using PyMuPDF, yielding documents as files finish.
+    executor: "process", "thread", or "auto" (threads when the median PDF is under 1 MB);
+    defaults to CONCURRENCY[".pdf"]
+    '''
 
-    all_documents = []
-    excel_dir = Path(directory)
+    default_executor, workers = _concurrency(".pdf")
 
-    # finding all excel files recursively
-    excel_files = list(excel_dir.glob('**/*.xlsx'))
+    # finding all pdfs recursively
+    pdf_files = list(_index_dir(str(directory)).get('.pdf', ()))
 
-    print(f"\n====== Found {len(excel_files)} Excel files to process ======")
+    log.info("====== Found %d PDF files to process ======", len(pdf_files))
 
-    for file in excel_files:
-        print(f"\n[INFO] Processing: {file.name} file")
+    yield from _with_total(
+        _load_in_parallel(_load_one_pdf, pdf_files, executor or default_executor, workers), "PDF")
 
-        try:
-            loader = StructuredExcelLoader(str(file))
-            documents = loader.load()
 
-            # .extend() adds individual items to the list
-            all_documents.extend(documents)
+# ==========================================================================
+
+# 2. read all the text files inside the directory
 
-            print(
-                f"\n✅ Successfully Loaded <{len(documents)}> pages from {file.name}")
-            print("=" * 50)
+def process_all_texts(directory):
+    '''Process all text files in a directory'''
 
-        except Exception as e:
-            print(f"❌ Error processing {file.name}: {e}")
-            continue
+    # finding all text files recursively
+    text_files = list(_index_dir(str(directory)).get('.txt', ()))
 
-    print(f"\n\n[INFO] Total EXCEL documents loaded: <{len(all_documents)}>\n")
+    log.info("====== Found %d text files to process ======", len(text_files))
 
-    return all_documents
+    yield from _with_total(
+        _load_in_parallel(_load_one_text, text_files, *_concurrency(".txt")), "TEXT")
 
 
 # ==========================================================================
 
-# 7. load all word files in a directory UnstructuredWordDocumentLoader
+# 3. read all the web pages from a list of urls
 
-def process_all_word_docs(directory):
-    '''Process all word files in a directory'''
+def process_all_webpages(urls):
+    '''Process all web pages in a list'''
 
-    all_documents = []
-    word_dir = Path(directory)
+    log.info("====== Found %d web pages to process ======", len(urls))
 
-    # finding all word files recursively
-    word_files = list(word_dir.glob('**/*.docx'))
+    results = asyncio.run(_fetch_all_webpages(urls)) if urls else []
 
-    print(f"\n====== Found {len(word_files)} Word files to process ======")
+    yield from _with_total(chain.from_iterable(results), "WEBPAGE")
 
-    for file in word_files:
-        print(f"\n[INFO] Processing: {file.name} file")
 
-        try:
-            loader = UnstructuredWordDocumentLoader(str(file))
-            documents = loader.load()
+# ==========================================================================
 
-            # .extend() adds individual items to the list
-            all_documents.extend(documents)
+# 5. load all csv files in a directory
 
-            print(
-                f"\n✅ Successfully Loaded <{len(documents)}> pages from {file.name}")
-            print("=" * 50)
+def process_all_csvs(directory):
+    '''Process all csv files in a directory'''
 
-        except Exception as e:
-            print(f"❌ Error processing {file.name}: {e}")
-            continue
+    # finding all csv files recursively
+    csv_files = list(_index_dir(str(directory)).get('.csv', ()))
 
-    print(f"\n\n[INFO] Total WORD documents loaded: <{len(all_documents)}>\n")
+    log.info("====== Found %d CSV files to process ======", len(csv_files))
 
-    return all_documents
+    yield from _with_total(
+        _load_in_parallel(_load_one_csv, csv_files, *_concurrency(".csv")), "CSV")
+
+
+# ==========================================================================
+
+# 6. load all excel files in a directory using langchain_excel_loader
+
+def process_all_excels(directory):
+    '''Process all excel files in a directory'''
+
+    # finding all excel files recursively
+    excel_files = list(_index_dir(str(directory)).get('.xlsx', ()))
+
+    log.info("====== Found %d Excel files to process ======", len(excel_files))
+
+    yield from _with_total(
+        _load_in_parallel(_load_one_excel, excel_files, *_concurrency(".xlsx")), "EXCEL")
+
+
+# ==========================================================================
+
+# 7. load all word files in a directory using python-docx
+
+def process_all_word_docs(directory):
+    '''Process all word files in a directory'''
+
+    # finding all word files recursively
+    word_files = list(_index_dir(str(directory)).get('.docx', ()))
+
+    log.info("====== Found %d Word files to process ======", len(word_files))
+
+    yield from _with_total(
+        _load_in_parallel(_load_one_docx, word_files, *_concurrency(".docx")), "WORD")
 
 
 # ==========================================================================
@@ -248,37 +714,43 @@ def process_all_word_docs(directory):
 def process_all_pptx(directory):
     '''Process all pptx files in a directory using UnstructuredPowerPointLoader'''
 
-    all_documents = []
-    pptx_dir = Path(directory)
-
     # finding all pptx files recursively
-    pptx_files = list(pptx_dir.glob('**/*.pptx'))
+    pptx_files = list(_index_dir(str(directory)).get('.pptx', ()))
 
-    print(f"\n====== Found {len(pptx_files)} PPTX files to process ======")
+    log.info("====== Found %d PPTX files to process ======", len(pptx_files))
 
-    for file in pptx_files:
-        print(f"\n[INFO] Processing: {file.name} file")
+    yield from _with_total(
+        _load_in_parallel(_load_one_pptx, pptx_files, *_concurrency(".pptx")), "PPTX")
 
-        try:
-            loader = UnstructuredPowerPointLoader(
-                str(file)
-            )
-            documents = loader.load()
 
-            # .extend() adds individual items to the list
-            all_documents.extend(documents)
+# ==========================================================================
 
-            print(
-                f"\n✅ Successfully Loaded <{len(documents)}> pages from {file.name}")
-            print("=" * 50)
+# 9. load every supported file in a directory in one pass
 
-        except Exception as e:
-            print(f"❌ Error processing {file.name}: {e}")
-            continue
+def ingest_directory(directory, incremental=False, cache_path=INGEST_CACHE_PATH):
+    '''
+    Walk a directory once and load every file with a loader in LOADERS, each file type on its
+    own CONCURRENCY-tuned pool (generator).
+    With incremental=True, files unchanged (same size + mtime) since the last incremental run are skipped.
+    '''
 
-    print(f"\n\n[INFO] Total PPTX documents loaded: <{len(all_documents)}>\n")
+    # an incremental run exists to pick up new files, so never trust an earlier listing
+    if incremental:
+        _index_dir.cache_clear()
 
-    return all_documents
+    index = _index_dir(str(directory))
+
+    paths = [path for suffix in LOADERS for path in index.get(suffix, ())]
+
+    log.info("====== Found %d files to process ======", len(paths))
+
+    if incremental:
+        documents = _load_changed_files(paths, cache_path)
+    else:
+        documents = chain.from_iterable(
+            documents for documents, _ in _load_by_type(paths))
+
+    yield from _with_total(documents, "FILE")
 
 
 # ==========================================================================
@@ -291,17 +763,15 @@ def load_all_data(directory, urls=None):
     """
     Load all supported file types + optional web pages from a directory.
     """
-    all_docs = []
-    all_docs += process_all_pdfs(directory)
-    all_docs += process_all_texts(directory)
-    all_docs += process_all_word_docs(directory)
-    all_docs += process_all_csvs(directory)
-    all_docs += process_all_excels(directory)
-    all_docs += process_all_pptx(directory)
-    if urls:
-        all_docs += process_all_webpages(urls)
-
-    print(f"🎯 Total documents loaded from all sources: {len(all_docs)}")
+    # rescan the directory for this run
+    _index_dir.cache_clear()
+
+    all_docs = list(chain.from_iterable([
+        ingest_directory(directory),
+        process_all_webpages(urls) if urls else (),
+    ]))
+
+    log.info("🎯 Total documents loaded from all sources: %d", len(all_docs))
 
     return all_docs
 
@@ -2,31 +2,46 @@
 Splits loaded documents into smaller, embedding-friendly chunks.
 """
 
+import logging
+import tiktoken
 from langchain_classic.text_splitter import RecursiveCharacterTextSplitter
 
 
+# chunk sizes are in tokens; 256 matches the embedding model's input window
+CHUNK_SIZE = 256
+CHUNK_OVERLAP = 40
+
+log = logging.getLogger(__name__)
+
+_encoding = tiktoken.get_encoding("cl100k_base")
+
+
+def _token_length(text):
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+# built once at import time and reused by every split_docs call
+_text_splitter = RecursiveCharacterTextSplitter(
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP,
+    length_function=_token_length,
+    separators=["\n\n", "\n", ". ", " ", ""]
+)
+
+
 def split_docs(documents):
     """
     Split loaded documents into chunks for embedding.
     """
 
     if not documents:
-        print("⚠️ No documents to split.")
+        log.warning("⚠️ No documents to split.")
         return []
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1200,
-        chunk_overlap=200,
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""]
-    )
-
-    chunked_documents = text_splitter.split_documents(documents)
+    chunked_documents = _text_splitter.split_documents(documents)
 
-    print("\n✅✅ Documents split successfully!")
-    print(
-        f"\n[INFO] Splitted <{len(documents)}> documents into <{len(chunked_documents)}> chunks."
-    )
-    print("=" * 50)
+    log.info("✅✅ Documents split successfully!")
+    log.info("[INFO] Splitted <%d> documents into <%d> chunks.\n%s",
+             len(documents), len(chunked_documents), "=" * 50)
 
     return chunked_documents
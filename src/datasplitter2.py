@@ -1,24 +1,181 @@
-from langchain_classic.text_splitter import RecursiveCharacterTextSplitter
+import logging
+import queue
+import re
+import threading
+from itertools import islice
+from langchain_classic.text_splitter import TextSplitter
 
 
 # 2.SPLITTING DOCUMENTS INTO CHUNKS
 
+log = logging.getLogger(__name__)
+
+# how many loaded documents are split together before their chunks are handed on
+SPLIT_BATCH_SIZE = 64
+
+# split_stream: at most this many loaded documents wait between the loader and the splitter
+# (the loader itself only runs a bounded window of files ahead, see dataloader2._bounded_map),
+# and a partial batch is flushed after this many seconds without a new document
+STREAM_QUEUE_SIZE = 128
+STREAM_FLUSH_SECONDS = 2
+
+_END_OF_STREAM = object()
+
+
+# a chunk may end right after any whitespace separator (a space or a newline)
+_SEPARATOR_RE = re.compile(r"[ \n]")
+
+
+class RegexTextSplitter(TextSplitter):
+    '''
+    Character splitter that greedily packs text into chunks of at most chunk_size
+    characters, ending each chunk after the last space/newline that fits
+    (a hard cut is made only when a stretch has no separator at all).
+    Boundaries are located with C-level str.rfind / regex searches, one per chunk,
+    instead of recursively splitting and re-merging the text per separator
+    '''
+
+    def _chunk_end(self, text, start):
+        end = start + self._chunk_size
+
+        if end >= len(text):
+            return len(text)
+
+        # last separator that still fits in this chunk
+        cut = max(text.rfind(" ", start, end), text.rfind("\n", start, end))
+
+        return cut + 1 if cut >= start else end
+
+    def split_text(self, text):
+        overlap = self._chunk_overlap
+        length = len(text)
+
+        chunks = []
+        start = 0
+
+        while start < length:
+            end = self._chunk_end(text, start)
+
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+
+            if end >= length:
+                break
+
+            # next chunk starts after the first separator inside the overlap window ...
+            match = _SEPARATOR_RE.search(text, max(start, end - overlap - 1), end - 1)
+            next_start = match.end() if match else end
+
+            # ... unless that chunk couldn't reach past this one (e.g. a long unbroken
+            # token follows), in which case overlapping would only re-emit the same text
+            if next_start < end and self._chunk_end(text, next_start) <= end:
+                next_start = end
+
+            start = next_start
+
+        return chunks
+
+
+def _text_splitter():
+    return RegexTextSplitter(chunk_size=1200, chunk_overlap=200)
+
+
+# splitting a stream of documents batch by batch (e.g. straight from the process_all_* generators)
+def iter_split_docs(documents, batch_size=SPLIT_BATCH_SIZE):
+    '''Yield (batch, chunks) for every batch_size documents, so only one batch is held in memory'''
+
+    text_splitter = _text_splitter()
+    documents = iter(documents)
+
+    while batch := list(islice(documents, batch_size)):
+        yield batch, text_splitter.split_documents(batch)
+
+
+# splitting while the loaders are still running (load -> split pipeline)
+def split_stream(documents):
+    '''
+    Drain a document iterator on a background thread and split it on this one,
+    yielding a list of chunks per batch so embedding can start before loading ends
+    '''
+
+    text_splitter = _text_splitter()
+    pending = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def put(item):
+        # give up once the consumer has gone away instead of blocking on a full queue forever
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        source = iter(documents)
+        try:
+            for document in source:
+                if not put(document):
+                    break
+        except Exception as e:
+            put(e)
+        finally:
+            # shut the loader down (process pool, log listener) if we stopped early
+            if hasattr(source, "close"):
+                source.close()
+            put(_END_OF_STREAM)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        yield from _split_pending(text_splitter, pending)
+    finally:
+        stop.set()
+
+
+def _split_pending(text_splitter, pending):
+    batch = []
+
+    while True:
+        try:
+            item = pending.get(timeout=STREAM_FLUSH_SECONDS)
+        except queue.Empty:
+            # loader is busy on a slow file; don't sit on what we already have
+            if batch:
+                yield text_splitter.split_documents(batch)
+                batch = []
+            continue
+
+        if item is _END_OF_STREAM:
+            break
+        if isinstance(item, Exception):
+            raise item
+
+        batch.append(item)
+
+        if len(batch) >= SPLIT_BATCH_SIZE:
+            yield text_splitter.split_documents(batch)
+            batch = []
+
+    if batch:
+        yield text_splitter.split_documents(batch)
+
+
 # splitting loaded documents into smaller chunks
 def split_docs(documents):
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1200,
-        chunk_overlap=200,
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""]
-    )
+    document_count = 0
+    chunked_documents = []
 
-    chunked_documents = text_splitter.split_documents(documents)
+    for batch, chunks in iter_split_docs(documents):
+        document_count += len(batch)
+        chunked_documents.extend(chunks)
 
-    print("\n✅✅ Document Splitted successfully!")
+    log.info("✅✅ Document Splitted successfully!")
 
-    print(
-        f"\n[INFO] Splitted <{len(documents)}> documents into <{len(chunked_documents)}> chunks.")
-    
-    print("=" * 50)
+    log.info("[INFO] Splitted <%d> documents into <%d> chunks.\n%s",
+             document_count, len(chunked_documents), "=" * 50)
 
     return chunked_documents
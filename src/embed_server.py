@@ -0,0 +1,50 @@
+'''
+embedding server for RAG system: loads the embedding model once and serves batched /embed requests,
+so Streamlit workers and ingestion processes don't each hold their own copy of the model
+
+run with:
+    uvicorn src.embed_server:app --host 127.0.0.1 --port 8001
+then point the app at it with EMBED_SERVER_URL=http://127.0.0.1:8001
+'''
+
+import os
+import msgpack
+import numpy as np
+from fastapi import FastAPI, Response
+from pydantic import BaseModel
+from src.embedding import huggingface_embeddings
+
+
+embeddings = huggingface_embeddings(
+    os.getenv("EMBED_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2"))
+
+app = FastAPI(title="RAG embedding server")
+
+
+class EmbedRequest(BaseModel):
+    texts: list[str]
+
+
+@app.post("/embed")
+def embed(request: EmbedRequest):
+    '''Embed a batch of texts; returns msgpack {"shape": [n, d], "data": float32 bytes}'''
+
+    vectors = np.asarray(
+        embeddings.embed_documents(request.texts), dtype=np.float32)
+
+    body = msgpack.packb(
+        {"shape": list(vectors.shape), "data": vectors.tobytes()})
+
+    return Response(content=body, media_type="application/msgpack")
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=os.getenv("EMBED_SERVER_HOST", "127.0.0.1"),
+                port=int(os.getenv("EMBED_SERVER_PORT", "8001")))
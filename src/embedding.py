@@ -2,13 +2,144 @@
 generating embeddings for the chunked documents for RAG system
 '''
 
+import os
+import msgpack
+import numpy as np
+import requests
+from langchain_core.embeddings import Embeddings
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_ollama import OllamaEmbeddings
 import torch
+from src.datasplitter import CHUNK_SIZE
 
 
 # 3.GENERATING EMBEDDINGS FOR THE CHUNKED DOCUMENTS
 
+# int8 ONNX exports produced by scripts/quantize_embed.py
+ONNX_MODELS_PATH = "./models"
+
+
+class OnnxInt8Embeddings(Embeddings):
+    '''Sentence-transformer embeddings run through an int8-quantized ONNX Runtime session on CPU'''
+
+    def __init__(self, model_dir, batch_size=128, max_length=256):
+        # optional dependency, only needed when an int8 export exists
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir, file_name="model_quantized.onnx", provider="CPUExecutionProvider")
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+    def _encode(self, texts):
+        vectors = []
+
+        for start in range(0, len(texts), self.batch_size):
+            batch = self.tokenizer(
+                texts[start:start + self.batch_size],
+                padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="np")
+
+            hidden = self.model(**batch).last_hidden_state
+
+            # mean pooling over real tokens, then L2-normalize (same as the sentence-transformer)
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / \
+                mask.sum(axis=1).clip(min=1e-9)
+            vectors.append(
+                pooled / np.linalg.norm(pooled, axis=1, keepdims=True))
+
+        return np.concatenate(vectors).tolist() if vectors else []
+
+    def embed_documents(self, texts):
+        return self._encode(list(texts))
+
+    def embed_query(self, text):
+        return self._encode([text])[0]
+
+
+class RemoteEmbeddings(Embeddings):
+    '''Embeddings computed by the shared embedding server (src/embed_server.py)'''
+
+    def __init__(self, url, batch_size=256, timeout=120):
+        self.url = url.rstrip("/") + "/embed"
+        self.batch_size = batch_size
+        self.timeout = timeout
+        # keep-alive connection reused for every batch
+        self.session = requests.Session()
+
+    def _encode(self, texts):
+        vectors = []
+
+        for start in range(0, len(texts), self.batch_size):
+            response = self.session.post(
+                self.url, json={"texts": texts[start:start + self.batch_size]}, timeout=self.timeout)
+            response.raise_for_status()
+
+            payload = msgpack.unpackb(response.content)
+            vectors.append(np.frombuffer(
+                payload["data"], dtype=np.float32).reshape(payload["shape"]))
+
+        return np.concatenate(vectors).tolist() if vectors else []
+
+    def embed_documents(self, texts):
+        return self._encode(list(texts))
+
+    def embed_query(self, text):
+        return self._encode([text])[0]
+
+
+def _compile_for_fixed_shape(model, max_length, batch_size):
+    '''
+    Pad every batch to max_length tokens and to one of two batch sizes (1 for single
+    queries, batch_size for everything else), torch.compile the transformer for those
+    static shapes, then run a dummy batch of each so compilation happens before the first real request.
+    '''
+    model.max_seq_length = max_length
+    transformer = model[0]
+    pad_id = transformer.tokenizer.pad_token_id or 0
+
+    # real row count of each padded batch, keyed by its features dict (encode may run on several threads)
+    real_rows = {}
+
+    def pad_features(module, args, kwargs):
+        features = args[0] if args else kwargs["features"]
+        rows = features["input_ids"].shape[0]
+        target_rows = 1 if rows == 1 else batch_size
+
+        for key, value in (("input_ids", pad_id), ("attention_mask", 0), ("token_type_ids", 0)):
+            tensor = features.get(key)
+            if tensor is not None:
+                features[key] = torch.nn.functional.pad(
+                    tensor, (0, max_length - tensor.shape[1], 0, target_rows - rows), value=value)
+
+        real_rows[id(features)] = rows
+
+    def drop_padding_rows(module, args, kwargs, features):
+        rows = real_rows.pop(id(features))
+        for key, value in features.items():
+            if torch.is_tensor(value) and value.dim() > 0 and value.shape[0] > rows:
+                features[key] = value[:rows]
+
+    transformer.register_forward_pre_hook(pad_features, with_kwargs=True)
+    transformer.register_forward_hook(drop_padding_rows, with_kwargs=True)
+
+    auto_model = transformer.auto_model
+    auto_model.forward = torch.compile(
+        auto_model.forward, mode="reduce-overhead", fullgraph=True, dynamic=False)
+
+    try:
+        model.encode(["warm-up"], batch_size=batch_size)
+        model.encode(["warm-up"] * batch_size, batch_size=batch_size)
+        print(f"[INFO] Model compiled for 1x{max_length} and {batch_size}x{max_length} token batches")
+    except Exception as e:
+        # fall back to eager execution (padding stays, it's harmless)
+        del auto_model.forward
+        print(f"⚠️ torch.compile failed, running eagerly: {e}")
+
+
 # 1. HuggingFace Embeddings
 def huggingface_embeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"):
     '''Generate embeddings for the chunked documents using HuggingFaceEmbeddings'''
@@ -19,18 +150,40 @@ def huggingface_embeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"):
 
     print(f"\n[INFO] Using device: {device}")
 
+    # on CPU prefer the int8 ONNX export when one has been generated
+    onnx_dir = os.path.join(
+        ONNX_MODELS_PATH, f"{model_name.split('/')[-1]}-int8")
+
+    if device == 'cpu' and os.path.isdir(onnx_dir):
+        embeddings = OnnxInt8Embeddings(onnx_dir)
+
+        print(f"[INFO] Loaded int8 ONNX model from {onnx_dir}")
+        print("=" * 50)
+
+        return embeddings
+
+    # half precision only pays off on GPU tensor cores; CPUs stay on FP32
+    dtype = torch.float16 if device == 'cuda' else torch.float32
+
+    batch_size = 128
+
     embeddings = HuggingFaceEmbeddings(
         model_name=model_name, show_progress=True,
         model_kwargs={
-            'device': device
+            'device': device,
+            'model_kwargs': {'torch_dtype': dtype}
         },
         encode_kwargs={
-            'batch_size': 32,
+            'batch_size': batch_size,
             'normalize_embeddings': True
         }
 
     )
 
+    # opt-in: compilation takes a while up front and needs a working torch.compile toolchain
+    if os.getenv("EMBED_TORCH_COMPILE") == "1":
+        _compile_for_fixed_shape(embeddings._client, CHUNK_SIZE, batch_size)
+
     print(f"[INFO] Model loaded successfully on {device.upper()}")
 
     print("=" * 50)
@@ -54,3 +207,19 @@ def ollama_embeddings(model_name):
     print("=" * 50)
 
     return embeddings
+
+
+# ==========================================================================
+
+# 3. Remote Embeddings (shared embedding server)
+
+def remote_embeddings(url):
+    '''Generate embeddings through a running embedding server (see src/embed_server.py)'''
+
+    print(f"\n[INFO] Using embedding server at {url}")
+
+    embeddings = RemoteEmbeddings(url)
+
+    print("=" * 50)
+
+    return embeddings
@@ -1,5 +1,76 @@
+'''
+utility helpers for the RAG system
+'''
 
+import logging
+import os
+import faiss
+import numpy as np
 
 
+# LOGGING
 
+def configure_logging(level=logging.INFO):
+    '''
+    Show this project's progress messages (the "src" loggers) on the console without
+    turning on INFO output from every library (httpx, sentence-transformers, faiss, ...)
+    '''
 
+    logger = logging.getLogger("src")
+
+    # streamlit re-runs the script on every interaction; attach the handler only once
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+class FileName:
+    '''Log argument that formats as the path's file name, only when the record is actually emitted'''
+
+    __slots__ = ("path",)
+
+    def __init__(self, path):
+        self.path = path
+
+    def __str__(self):
+        return os.path.basename(self.path) or self.path
+
+
+# SEMANTIC ANSWER CACHE
+# past queries live in a small inner-product index; a new query whose embedding
+# is close enough to a cached one reuses that answer instead of re-running the chain
+
+def create_semantic_cache(dimension):
+    '''Create an empty semantic cache for query embeddings of the given dimension'''
+
+    return {"index": faiss.IndexFlatIP(dimension), "entries": []}
+
+
+def _as_unit_vector(query_embedding):
+    vector = np.asarray(query_embedding, dtype=np.float32)
+    return (vector / np.linalg.norm(vector))[None, :]
+
+
+def lookup_semantic_cache(cache, query_embedding, threshold=0.97):
+    '''Return the cached entry for the most similar past query, or None below the threshold'''
+
+    if cache["index"].ntotal == 0:
+        return None
+
+    scores, ids = cache["index"].search(_as_unit_vector(query_embedding), 1)
+
+    if scores[0, 0] >= threshold:
+        return cache["entries"][ids[0, 0]]
+
+    return None
+
+
+def add_to_semantic_cache(cache, query_embedding, entry):
+    '''Remember an entry (e.g. answer + context) under the query's embedding'''
+
+    cache["index"].add(_as_unit_vector(query_embedding))
+    cache["entries"].append(entry)
@@ -3,20 +3,319 @@ vectorstore.py, contains functions to create vectorstore, load vectorstore and a
 '''
 
 # VECTORSTORE RELATED IMPORTS
+import os
+import json
+import math
+import hashlib
+import faiss
+import numpy as np
+import pyarrow as pa
+from langchain_core.documents import Document
 from langchain_classic.vectorstores import FAISS
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_community.vectorstores.utils import DistanceStrategy
 
 
+# below this many chunks a brute-force scan is fast enough and IVF-PQ has too little to train on
+IVFPQ_MIN_VECTORS = 10_000
+
+# number of IVF lists probed per query; raise for recall, lower for speed
+DEFAULT_NPROBE = 16
+
+# memory-map saved indexes read-only instead of reading them onto the heap, so every
+# Streamlit worker shares one page-cache copy (not on Windows, where a mapped file
+# can't be replaced by a later save)
+MMAP_IO_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+MMAP_SUPPORTED = os.name != "nt"
+
+# {sha256 of chunk text: docstore id}, saved next to the index for incremental updates
+CHUNK_HASHES_FILE = "chunk_hashes.json"
+
+
+# =====================================================================
+# COLUMNAR CHUNK STORAGE
+# chunks are kept as one PyArrow table (text / source / page / other metadata)
+# instead of a list of Document objects; Documents are only built on retrieval
+
+_TABLE_SCHEMA = pa.schema([
+    ("text", pa.large_string()),
+    ("source", pa.string()),
+    ("page", pa.int32()),
+    ("metadata", pa.string()),  # remaining metadata keys, JSON-encoded
+])
+
+
+def chunks_to_table(chunks):
+    """
+    Convert chunked Documents into a columnar PyArrow table.
+    """
+    texts, sources, pages, extra = [], [], [], []
+
+    for doc in chunks:
+        metadata = dict(doc.metadata)
+        page = metadata.get("page")
+
+        texts.append(doc.page_content)
+        sources.append(str(metadata.pop("source", "")))
+        pages.append(metadata.pop("page") if isinstance(page, int) else None)
+        extra.append(json.dumps(metadata, default=str))
+
+    return pa.table([texts, sources, pages, extra], schema=_TABLE_SCHEMA)
+
+
+class ArrowDocstore(Docstore, AddableMixin):
+    """
+    Docstore over a PyArrow chunk table; Documents are materialized only when looked up.
+    """
+
+    def __init__(self, table, ids):
+        self.table = table
+        self._rows = {doc_id: row for row, doc_id in enumerate(ids)}
+
+    def search(self, search):
+        row = self._rows.get(search)
+        if row is None:
+            return f"ID {search} not found."
+
+        metadata = json.loads(self.table.column("metadata")[row].as_py())
+        metadata["source"] = self.table.column("source")[row].as_py()
+        page = self.table.column("page")[row].as_py()
+        if page is not None:
+            metadata["page"] = page
+
+        return Document(
+            id=search,
+            page_content=self.table.column("text")[row].as_py(),
+            metadata=metadata
+        )
+
+    def add(self, texts):
+        overlapping = set(texts).intersection(self._rows)
+        if overlapping:
+            raise ValueError(
+                f"Tried to add ids that already exist: {overlapping}")
+
+        start = self.table.num_rows
+        self.table = pa.concat_tables(
+            [self.table, chunks_to_table(list(texts.values()))]).combine_chunks()
+        self._rows.update({doc_id: start + i for i, doc_id in enumerate(texts)})
+
+    def delete(self, ids):
+        # rows stay in the table but become unreachable
+        for doc_id in ids:
+            self._rows.pop(doc_id, None)
+
+
+# =====================================================================
+
+# GPU resources are shared by every index moved onto the device (and must outlive them)
+_gpu_resources = None
+
+
+def _move_index_to_gpu(vectorstore):
+    """
+    Move the FAISS index onto the first GPU when faiss-gpu and a CUDA device are available.
+    """
+    global _gpu_resources
+
+    if not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0:
+        return vectorstore
+
+    # faiss-gpu only has flat and IVF indexes; e.g. a flat scalar-quantizer index stays on CPU
+    if not isinstance(faiss.downcast_index(vectorstore.index), (faiss.IndexFlat, faiss.IndexIVF)):
+        print("[INFO] FAISS index type has no GPU version, keeping it on CPU")
+        return vectorstore
+
+    if _gpu_resources is None:
+        _gpu_resources = faiss.StandardGpuResources()
+
+    try:
+        vectorstore.index = faiss.index_cpu_to_gpu(
+            _gpu_resources, 0, vectorstore.index)
+        print("[INFO] FAISS index moved to GPU")
+    except RuntimeError as e:
+        print(f"⚠️ Could not move FAISS index to GPU, keeping it on CPU: {e}")
+
+    return vectorstore
+
+
+def _is_gpu_index(index):
+    return type(index).__name__.startswith("GpuIndex")
+
+
+def _save_vectorstore(vectorstore, vectorstore_path="faiss_index"):
+    """
+    Save the vectorstore locally, always persisting a CPU copy of the index.
+    Files are written to a temp folder and renamed into place, so processes that
+    have the previous index memory-mapped keep reading their (unchanged) copy.
+    """
+    index = vectorstore.index
+    tmp_path = vectorstore_path.rstrip("/\\") + ".tmp"
+
+    if _is_gpu_index(index):
+        vectorstore.index = faiss.index_gpu_to_cpu(index)
+
+    try:
+        vectorstore.save_local(tmp_path)
+    finally:
+        vectorstore.index = index
+
+    os.makedirs(vectorstore_path, exist_ok=True)
+    for name in os.listdir(tmp_path):
+        os.replace(os.path.join(tmp_path, name),
+                   os.path.join(vectorstore_path, name))
+    os.rmdir(tmp_path)
+
+
+def _chunk_hash(doc):
+    return hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()
+
+
+def _load_hashes(vectorstore, vectorstore_path="faiss_index"):
+    """
+    Load the chunk-hash -> docstore-id map saved with the index.
+    Indexes saved without one get it rebuilt from their docstore.
+    """
+    path = os.path.join(vectorstore_path, CHUNK_HASHES_FILE)
+
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    return {
+        _chunk_hash(vectorstore.docstore.search(doc_id)): doc_id
+        for doc_id in vectorstore.index_to_docstore_id.values()
+    }
+
+
+def _persist_hashes(hashes, vectorstore_path="faiss_index"):
+    with open(os.path.join(vectorstore_path, CHUNK_HASHES_FILE), "w", encoding="utf-8") as f:
+        json.dump(hashes, f)
+
+
+def _set_nprobe(index, nprobe):
+    """
+    Set how many inverted lists an IVF index scans per query (no-op for flat indexes).
+    """
+    if hasattr(index, "nprobe"):
+        index.nprobe = nprobe
+
+
+def _match_distance_strategy(vectorstore):
+    """
+    Score results by inner product when the index was built with that metric.
+    """
+    if vectorstore.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        vectorstore.distance_strategy = DistanceStrategy.MAX_INNER_PRODUCT
+
+    return vectorstore
+
+
+def _embed_texts(texts, embeddings, batch_size=256):
+    """
+    Encode all chunk texts into one float32 matrix.
+    SentenceTransformer-backed embeddings are encoded straight to NumPy in large batches,
+    skipping LangChain's per-batch list conversion; other providers use embed_documents.
+    """
+    client = getattr(embeddings, "_client", None) or getattr(
+        embeddings, "client", None)
+
+    if hasattr(client, "encode"):
+        vectors = client.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=True,
+            normalize_embeddings=True
+        )
+    else:
+        vectors = embeddings.embed_documents(texts)
+
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def _build_index(vectors, index_type="auto", nprobe=DEFAULT_NPROBE):
+    """
+    Build an inner-product FAISS index for the (L2-normalized) embedding matrix.
+
+    index_type:
+    - "flat": exact float32 search
+    - "sq8" / "fp16": scalar-quantized codes (4x / 2x smaller than float32)
+    - "ivfpq": IVF lists + 8-bit PQ codes for sub-linear search on large corpora
+    - "auto": "fp16" for small corpora, "ivfpq" from IVFPQ_MIN_VECTORS chunks up
+      (fp16 needs no training, so vectors upserted later aren't squeezed into a range
+       learned from the first corpus the way sq8 codes would be)
+    """
+    n, d = vectors.shape
+    pq_m = next((m for m in (48, 32, 16, 8) if d % m == 0), None)
+
+    # cosine similarity == inner product on unit vectors
+    faiss.normalize_L2(vectors)
+
+    if index_type == "auto":
+        large = n >= IVFPQ_MIN_VECTORS and pq_m is not None
+        index_type = "ivfpq" if large else "fp16"
+
+    if index_type == "ivfpq" and pq_m is None:
+        raise ValueError(
+            f"index_type='ivfpq' needs an embedding dimension divisible by 8 (got {d}); "
+            "use 'fp16', 'sq8' or 'flat'")
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(d)
+        index.add(vectors)
+        return index
+
+    if index_type in ("sq8", "fp16"):
+        qtype = (faiss.ScalarQuantizer.QT_8bit if index_type == "sq8"
+                 else faiss.ScalarQuantizer.QT_fp16)
+        index = faiss.IndexScalarQuantizer(
+            d, qtype, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.add(vectors)
+        return index
+
+    if index_type != "ivfpq":
+        raise ValueError(f"Unknown index_type: {index_type}")
+
+    nlist = int(4 * math.sqrt(n))
+    quantizer = faiss.IndexFlatIP(d)
+    index = faiss.IndexIVFPQ(
+        quantizer, d, nlist, pq_m, 8, faiss.METRIC_INNER_PRODUCT)
+
+    print(f"[INFO] Training IVF-PQ index (nlist={nlist}, m={pq_m})...")
+    index.train(vectors)
+    index.add(vectors)
+
+    # MMR retrieval reconstructs candidate vectors by id
+    index.make_direct_map()
+    _set_nprobe(index, nprobe)
+
+    return index
+
+
+# =====================================================================
+
 # 1. creating a new vectorstore from scratch
 
-def create_vectorstore(documents, embeddings):
+def create_vectorstore(documents, embeddings, index_type="auto", nprobe=DEFAULT_NPROBE):
     """
     Create a new FAISS vectorstore from documents and embeddings.
     """
     try:
-        vectorstore = FAISS.from_documents(
-            documents=documents,
-            embedding=embeddings,
-            distance_strategy='COSINE'  # Better for normalized embeddings
+        table = chunks_to_table(documents)
+        ids = [str(i) for i in range(table.num_rows)]
+
+        vectors = _embed_texts(table.column("text").to_pylist(), embeddings)
+
+        index = _build_index(vectors, index_type=index_type, nprobe=nprobe)
+
+        vectorstore = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=ArrowDocstore(table, ids),
+            index_to_docstore_id=dict(enumerate(ids)),
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
         )
 
         print(f"\n[INFO] Vector dimension: {vectorstore.index.d}")
@@ -26,10 +325,12 @@ def create_vectorstore(documents, embeddings):
         print("=" * 50)
 
         # Save
-        vectorstore.save_local("faiss_index")
+        _save_vectorstore(vectorstore, "faiss_index")
+        _persist_hashes(
+            {_chunk_hash(doc): str(i) for i, doc in enumerate(documents)}, "faiss_index")
         print("\n✅✅ Successfully saved FAISS index locally")
 
-        return vectorstore
+        return _move_index_to_gpu(vectorstore)
 
     except Exception as e:
         print(f"❌ Error during embedding and storing: {e}")
@@ -39,18 +340,26 @@ def create_vectorstore(documents, embeddings):
 
 # 2. loading an existing vectorstore from disk
 
-def load_vectorstore(embeddings, vectorstore_path="faiss_index"):
+def load_vectorstore(embeddings, vectorstore_path="faiss_index", nprobe=DEFAULT_NPROBE, mmap=True):
     """
     Load an existing FAISS vectorstore.
+    With mmap=True the index is memory-mapped read-only (near-instant load, shared
+    page cache); load with mmap=False to add documents to it.
     """
 
     try:
+        mmap = mmap and MMAP_SUPPORTED
+
         vectorstore = FAISS.load_local(
             vectorstore_path,
             embeddings=embeddings,
-            allow_dangerous_deserialization=True
+            allow_dangerous_deserialization=True,
+            io_flags=MMAP_IO_FLAGS if mmap else 0
         )
 
+        _match_distance_strategy(vectorstore)
+        _set_nprobe(vectorstore.index, nprobe)
+
         print(f"\n[INFO] Vector dimension: {vectorstore.index.d}")
 
         print(
@@ -59,6 +368,10 @@ def load_vectorstore(embeddings, vectorstore_path="faiss_index"):
 
         print("\n✅✅ Successfully LOADED Vectorstore.")
 
+        vectorstore = _move_index_to_gpu(vectorstore)
+        # a GPU copy is writable; a mapped CPU index must never be added to
+        vectorstore.read_only = mmap and not _is_gpu_index(vectorstore.index)
+
         return vectorstore
 
     except Exception as e:
@@ -80,6 +393,7 @@ def load_and_add_new_docs(new_docs, embeddings, vectorstore_path="faiss_index"):
             embeddings=embeddings,
             allow_dangerous_deserialization=True
         )
+        _match_distance_strategy(vectorstore)
 
         print("\n[INFO] Adding new CHUNKS to the Vectorstore...")
 
@@ -94,11 +408,57 @@ def load_and_add_new_docs(new_docs, embeddings, vectorstore_path="faiss_index"):
 
         print("\n✅✅ Successfully ADDED new chunks to the Vectorstore.")
 
-        return vectorstore
+        return _move_index_to_gpu(vectorstore)
 
     except Exception as e:
         print(f"❌ Error during LOADING and ADDING: {e}")
 
 
+# =====================================================================
+
+# 4. incrementally adding only the chunks that are not in the vectorstore yet
+
+def upsert_docs(vectorstore, new_chunks, vectorstore_path="faiss_index"):
+    """
+    Embed and add only chunks whose content hash is not already indexed, then save.
+    Returns the vectorstore and the number of chunks added; errors are re-raised.
+    """
+    try:
+        if getattr(vectorstore, "read_only", False):
+            raise ValueError(
+                "vectorstore is memory-mapped read-only; load it with mmap=False to add chunks")
+
+        known = _load_hashes(vectorstore, vectorstore_path)
+
+        new_docs = {}
+        for doc in new_chunks:
+            chunk_hash = _chunk_hash(doc)
+            if chunk_hash not in known and chunk_hash not in new_docs:
+                new_docs[chunk_hash] = doc
+
+        print(
+            f"\n[INFO] <{len(new_docs)}> of <{len(new_chunks)}> chunks are new")
+
+        if new_docs:
+            ids = vectorstore.add_documents(list(new_docs.values()))
+            known.update(zip(new_docs.keys(), ids))
+
+            _save_vectorstore(vectorstore, vectorstore_path)
+
+        _persist_hashes(known, vectorstore_path)
+
+        print(
+            f"[INFO] Total Vectors in the store: <{vectorstore.index.ntotal}>")
+        print("=" * 50)
+
+        print("\n✅✅ Successfully UPSERTED new chunks to the Vectorstore.")
+
+        return vectorstore, len(new_docs)
+
+    except Exception as e:
+        print(f"❌ Error during UPSERT: {e}")
+        raise
+
+
 # =====================================================================
 # END OF FILE
@@ -0,0 +1,49 @@
+import time
+
+from src.dataloader2 import (
+    CONCURRENCY, IN_FLIGHT_PER_WORKER, LOADERS, _concurrency, ingest_directory, load_all_data)
+
+
+def test_missing_directory_loads_nothing(tmp_path):
+    assert list(ingest_directory(str(tmp_path / "missing"))) == []
+
+
+def test_missing_directory_does_not_stop_web_loads(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.dataloader2.process_all_webpages", lambda urls: ["page"])
+
+    assert load_all_data(str(tmp_path / "missing"), ["http://example.com"]) == ["page"]
+
+
+def test_slow_consumer_bounds_the_files_loaded_ahead(tmp_path, monkeypatch):
+    for i in range(400):
+        (tmp_path / f"{i}.txt").write_text(f"file {i}")
+
+    loaded = []
+
+    def load_one_text(path):
+        loaded.append(path)
+        return [path]
+
+    monkeypatch.setitem(LOADERS, ".txt", load_one_text)
+    monkeypatch.setenv("RAG_TXT_WORKERS", "4")
+
+    documents = ingest_directory(str(tmp_path))
+    next(documents)
+    time.sleep(0.5)
+
+    assert len(loaded) <= 4 * IN_FLIGHT_PER_WORKER + 1
+    documents.close()
+
+
+def test_invalid_worker_counts_fall_back_to_the_defaults(monkeypatch, caplog):
+    monkeypatch.setenv("RAG_LOAD_WORKERS", "many")
+    monkeypatch.setenv("RAG_XLSX_WORKERS", "0")
+
+    assert _concurrency(".xlsx") == CONCURRENCY[".xlsx"]
+    assert "RAG_LOAD_WORKERS" in caplog.text and "RAG_XLSX_WORKERS" in caplog.text
+
+
+def test_load_workers_caps_but_does_not_raise_a_type(monkeypatch):
+    monkeypatch.setenv("RAG_LOAD_WORKERS", "10000")
+
+    assert _concurrency(".xlsx") == CONCURRENCY[".xlsx"]
@@ -0,0 +1,70 @@
+import threading
+import time
+
+from langchain_core.documents import Document
+
+from src import datasplitter2
+from src.dataloader2 import IN_FLIGHT_PER_WORKER, LOADERS, ingest_directory
+from src.datasplitter2 import RegexTextSplitter, split_stream
+
+
+def test_long_unbroken_token_does_not_repeat_the_preceding_text():
+    words = " ".join(f"w{i}" for i in range(60))
+    text = words + " " + "x" * 1500 + " tail"
+
+    chunks = RegexTextSplitter(chunk_size=1200, chunk_overlap=200).split_text(text)
+
+    assert chunks == [words, "x" * 1200, "x" * 300 + " tail"]
+
+
+def test_chunks_fit_and_overlap():
+    text = " ".join(f"word{i}" for i in range(2000))
+
+    chunks = RegexTextSplitter(chunk_size=1200, chunk_overlap=200).split_text(text)
+
+    assert all(len(chunk) <= 1200 for chunk in chunks)
+    # every chunk after the first starts with text repeated from the end of the previous one
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.split(" ")[0] in previous
+    assert chunks[-1].endswith("word1999")
+
+
+def test_split_stream_stops_the_loader_when_the_consumer_stops():
+    loader_closed = threading.Event()
+
+    def documents():
+        try:
+            while True:
+                yield Document(page_content="word " * 50)
+        finally:
+            loader_closed.set()
+
+    stream = split_stream(documents())
+    next(stream)
+    stream.close()
+
+    assert loader_closed.wait(timeout=5)
+
+
+def test_split_stream_with_a_slow_consumer_loads_a_bounded_number_of_files(tmp_path, monkeypatch):
+    for i in range(400):
+        (tmp_path / f"{i}.txt").write_text(f"file {i}")
+
+    loaded = []
+
+    def load_one_text(path):
+        loaded.append(path)
+        return [Document(page_content=path)]
+
+    monkeypatch.setitem(LOADERS, ".txt", load_one_text)
+    monkeypatch.setenv("RAG_TXT_WORKERS", "4")
+    monkeypatch.setattr(datasplitter2, "STREAM_QUEUE_SIZE", 2)
+    monkeypatch.setattr(datasplitter2, "SPLIT_BATCH_SIZE", 1)
+
+    stream = split_stream(ingest_directory(str(tmp_path)))
+    next(stream)
+    time.sleep(0.5)
+
+    # one split batch + the queue + one document held by the producer + the loader's window
+    assert len(loaded) <= 1 + 2 + 1 + 4 * IN_FLIGHT_PER_WORKER
+    stream.close()